@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 import os.path as osp
-import logging, subprocess, os, time, sys, glob
+import logging, subprocess, os, time, sys, glob, datetime, math, threading
 from contextlib import contextmanager
+from operator import attrgetter
 
 from . import path as seup
 
@@ -63,6 +64,24 @@ def temp_log_level(level):
         logger.setLevel(old_level)
 
 
+_thread_state = threading.local()
+
+@contextmanager
+def expected_exceptions(*exceptions):
+    """
+    Context manager to mark exceptions as expected in the current thread:
+    run_command does not log an error for failures it raises as one of them.
+    Unlike temp_log_level, this does not touch the global logger, so it is
+    safe to use from worker threads.
+    """
+    old_exceptions = getattr(_thread_state, 'expected_exceptions', ())
+    _thread_state.expected_exceptions = old_exceptions + exceptions
+    try:
+        yield
+    finally:
+        _thread_state.expected_exceptions = old_exceptions
+
+
 DRYMODE = False
 def drymode(flag=True):
     global DRYMODE
@@ -175,20 +194,29 @@ def listdir_check_isdir(fn):
     """
     def wrapper(*args, **kwargs):
         if not kwargs.pop('assume_isdir', False):
-            if not args[0].isdir(args[1]):
-                node = args[0].stat(args[1])
+            # A single stat both checks existence and provides the Inode for the error
+            node = args[0].stat(args[1])
+            if not node.isdir:
                 raise Exception('Cannot listdir {0}: not a directory; {1}'.format(args[1], node))
         return fn(*args, **kwargs)
     return wrapper
 
 
+try:
+    DEVNULL = subprocess.DEVNULL
+except AttributeError:
+    # python 2: open the null device once, rather than per command
+    DEVNULL = open(os.devnull, 'w')
+
+
 def run_command_rcode_and_output(cmd, env=None, dry=None, stdout=None, stderr=None):
     """Runs a command and captures output.
     Returns return code and captured output.
     """
     if dry is None: dry = DRYMODE
     if env is None: env = ENV
-    logger.info('%sIssuing command %s', '(dry) ' if dry else '', ' '.join(cmd))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info('%sIssuing command %s', '(dry) ' if dry else '', ' '.join(cmd))
     if dry: return 0, '<dry output>'
     process = subprocess.Popen(
         cmd,
@@ -198,12 +226,24 @@ def run_command_rcode_and_output(cmd, env=None, dry=None, stdout=None, stderr=No
         universal_newlines=True,
         )
     # Start running command and capturing output
-    output = []
-    for stdout_line in iter(process.stdout.readline, ''):
-        logger.debug('CMD: ' + stdout_line.strip('\n'))
-        output.append(stdout_line)
-    process.stdout.close()
-    process.wait()
+    if process.stdout is None:
+        # The caller redirected stdout elsewhere; there is nothing to capture
+        process.wait()
+        output = []
+    elif logger.isEnabledFor(logging.DEBUG):
+        # Stream line by line, so the output of long commands is logged as it comes
+        output = []
+        for stdout_line in iter(process.stdout.readline, ''):
+            logger.debug('CMD: %s', stdout_line.strip('\n'))
+            output.append(stdout_line)
+        process.stdout.close()
+        process.wait()
+    else:
+        # Nothing to log per line; read all output in one go
+        out, _ = process.communicate()
+        lines = out.split('\n') if out else ['']
+        output = [ l + '\n' for l in lines[:-1] ]
+        if lines[-1]: output.append(lines[-1])
     return process.returncode, output
 
 
@@ -247,12 +287,19 @@ def run_command(cmd, *args, **kwargs):
         logger.info('Command exited with status 0 - all good')
         return output
     else:
-        logger.error(
-            '\033[31mExit status {0} for command {1}\nOutput:\n{2}\033[0m'
-            .format(rcode, cmd, '\n'.join(output))
-            )
-        if rcode in rcodes:
-            raise rcodes[rcode](path)
+        exception = rcodes.get(rcode)
+        raised = exception or NonZeroExitCode
+        # Non-zero exit codes are expected in e.g. is_file_or_dir, which silences
+        # the logger, or in code marking the exception as expected; skip joining
+        # the output in that case
+        expected = getattr(_thread_state, 'expected_exceptions', ())
+        if logger.isEnabledFor(logging.ERROR) and not (expected and issubclass(raised, expected)):
+            logger.error(
+                '\033[31mExit status %s for command %s\nOutput:\n%s\033[0m',
+                rcode, cmd, ''.join(output)
+                )
+        if exception is not None:
+            raise exception(path)
         else:
             raise NonZeroExitCode(rcode, cmd)
 
@@ -260,21 +307,68 @@ def run_command(cmd, *args, **kwargs):
 def get_exitcode(cmd, *args, **kwargs):
     """
     Runs a command and returns the exit code.
+    Unless debugging, the output is not needed and is discarded rather than captured.
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        kwargs.setdefault('stdout', DEVNULL)
+        kwargs.setdefault('stderr', DEVNULL)
     rcode, _ = run_command_rcode_and_output(cmd, *args, **kwargs)
     logger.debug('Got exit code %s', rcode)
     return rcode
 
 
+BYTE_UNITS = ('', 'k', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y')
+
 def bytes_to_human_readable(num, suffix='B'):
     """
     Convert number of bytes to a human readable string
     """
-    for unit in ['','k','M','G','T','P','E','Z']:
-        if abs(num) < 1024.0:
-            return '{0:3.1f} {1}b'.format(num, unit)
-        num /= 1024.0
-    return '{0:3.1f} {1}b'.format(num, 'Y')
+    # The binary exponent of num determines the unit directly; no division loop needed
+    i_unit = min(max(0, (math.frexp(num)[1] - 1) // 10), len(BYTE_UNITS) - 1)
+    return '{0:3.1f} {1}b'.format(num / float(1 << 10*i_unit), BYTE_UNITS[i_unit])
+
+
+def timestamp_to_datetime(timestamp):
+    """
+    Converts a 'YYYY-MM-DD HH:MM:SS' timestamp to a datetime object.
+    Equivalent to strptime(timestamp, '%Y-%m-%d %H:%M:%S'), but constructs the
+    datetime from slices directly, which is much faster for long listings.
+    """
+    if len(timestamp) == 19:
+        try:
+            return datetime.datetime(
+                int(timestamp[:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:])
+                )
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+
+
+MONTHS = dict(
+    Jan=1, Feb=2, Mar=3, Apr=4, May=5, Jun=6,
+    Jul=7, Aug=8, Sep=9, Oct=10, Nov=11, Dec=12
+    )
+
+def ls_timestamp_to_datetime(month, day, time_or_year):
+    """
+    Converts the three date columns of an `ls -l`-style line (e.g. 'Jan 13 10:41'
+    or 'Jan 13 2019') to a datetime object.
+    Like strptime, the year defaults to 1900 if only the time is given.
+    """
+    try:
+        if ':' in time_or_year:
+            hour, minute = time_or_year.split(':')
+            return datetime.datetime(1900, MONTHS[month], int(day), int(hour), int(minute))
+        else:
+            return datetime.datetime(int(time_or_year), MONTHS[month], int(day))
+    except (KeyError, ValueError):
+        pass
+    timestamp = ' '.join((month, day, time_or_year))
+    try:
+        return datetime.datetime.strptime(timestamp, '%b %d %H:%M')
+    except ValueError:
+        return datetime.datetime.strptime(timestamp, '%b %d %Y')
 
 
 def is_macos():
@@ -284,19 +378,30 @@ def is_macos():
     return os.uname()[0] == 'Darwin'
 
 
+try:
+    from shutil import which
+except ImportError:
+    # python 2
+    which = None
+
 def cmd_exists(executable):
     """
     Checks if a command can be found on the system path.
-    Not a very smart implementation but does the job usually.
-    See https://stackoverflow.com/a/28909933/9209944 .
+    Uses shutil.which where available (python 3.3+); otherwise falls back to
+    a plain scan of the PATH, see https://stackoverflow.com/a/28909933/9209944 .
     """
-    return any(os.access(os.path.join(path, executable), os.X_OK) for path in os.environ["PATH"].split(os.pathsep))
+    if which is None:
+        return any(os.access(os.path.join(path, executable), os.X_OK) for path in os.environ["PATH"].split(os.pathsep))
+    return which(executable) is not None
 
 class Inode(object):
     """
     Basic container of information representing an inode on a
     storage element: isdir/isfile, modification time, size, and path.
+    Listings can create many of these, so instances carry no __dict__.
     """
+    __slots__ = ('path', 'modtime', 'isdir', 'size')
+
     @classmethod
     def from_path(cls, path, mgm=None):
         path = format(path, mgm)
@@ -475,19 +580,24 @@ def set_preferred_implementation(implementation):
     logger.info('Set implementation %s as preferred', PREFERRED_IMPL)
 
 
+# Order in which implementations are tried; fixed, so built once
+PREFERRED_ORDER_SSH = (ssh,)
+PREFERRED_ORDER_RM = (eos, gfal, pyxrd, xrd)
+PREFERRED_ORDER = (xrd, gfal, pyxrd, eos)
+
 def best_implementation(cmd_name, path=None):
     """
     Given a command name, returns an installed implementation that has this command
     """
     if path and seup.is_ssh(path):
         logger.debug('Path is ssh-like')
-        preferred_order = [ssh]
+        preferred_order = PREFERRED_ORDER_SSH
     elif cmd_name == 'rm':
-        preferred_order = [ eos, gfal, pyxrd, xrd]
+        preferred_order = PREFERRED_ORDER_RM
     else:
-        preferred_order = [ xrd, gfal, pyxrd, eos ]
+        preferred_order = PREFERRED_ORDER
     if PREFERRED_IMPL:
-        preferred_order.insert(0, PREFERRED_IMPL)
+        preferred_order = (PREFERRED_IMPL,) + preferred_order
     # Return first one that's installed
     for implementation in preferred_order:
         if implementation.is_installed() and hasattr(implementation, cmd_name):
@@ -552,6 +662,46 @@ def put(path, contents='', make_parent_dirs=True, tmpfile_path='seutils_tmpfile'
         os.remove(tmpfile_path)
 
 
+N_STAT_THREADS = 8
+
+@add_env_kwarg
+def stat_many(paths, not_exist_ok=False, return_exceptions=False, implementation=None):
+    """
+    Like stat, but for many paths at once. The requests are issued concurrently
+    by a pool of N_STAT_THREADS threads, so their round trips to the SE overlap.
+    Returns a list of Inodes in the same order as `paths`.
+
+    If not_exist_ok is True, None is returned for paths that do not exist, instead
+    of raising NoSuchPath, and no error is logged for them.
+
+    If return_exceptions is True, the exception is returned in place of the Inode
+    for paths that fail, instead of raising it. The caller is then expected to
+    handle it, so no error is logged either.
+    """
+    paths = list(paths)
+    if return_exceptions:
+        expected = (Exception,)
+    elif not_exist_ok:
+        expected = (NoSuchPath,)
+    else:
+        expected = ()
+    def stat_one(path):
+        try:
+            with expected_exceptions(*expected):
+                return stat_fn(path, implementation=implementation)
+        except Exception as e:
+            if not_exist_ok and isinstance(e, NoSuchPath): return None
+            if return_exceptions: return e
+            raise
+    if len(paths) <= 1: return [ stat_one(path) for path in paths ]
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(min(N_STAT_THREADS, len(paths)))
+    try:
+        return pool.map(stat_one, paths)
+    finally:
+        pool.terminate()
+
+
 MAX_RECURSION_DEPTH = 20
 
 @add_env_kwarg
@@ -572,86 +722,120 @@ def ls(path, stat=False, assume_isdir=False, no_expand_directory=False, implemen
     If no_expand_directory is True, the contents of the directory are not listed, and instead
     a formatted path to the directory is returned (similar to unix's ls -d)
     """
-    path = format(path)
     if assume_isdir:
-        status = 1
+        inode = None
+        isdir = True
     else:
-        status = is_file_or_dir(path, implementation=implementation)
-    # Depending on status, return formatted path to file, directory contents, or raise
-    if status == 0:
-        raise NoSuchPath(path)
-    elif status == 1:
-        # It's a directory
+        # A single stat tells whether the path exists and whether it is a directory;
+        # the Inode is reused below if stat is True, rather than requesting it again
+        try:
+            with expected_exceptions(NoSuchPath):
+                inode = stat_fn(path, implementation=implementation)
+        except NoSuchPath:
+            raise NoSuchPath(path)
+        isdir = inode.isdir
+    if isdir:
         if no_expand_directory:
             # If not expanding, just return a formatted path to the directory
-            return [stat_fn(path, implementation=implementation) if stat else path]
+            if stat and inode is None: inode = stat_fn(path, implementation=implementation)
+            return [inode if stat else path]
         else:
             # List the contents of the directory
             return listdir(path, assume_isdir=True, stat=stat, implementation=implementation) # No need to re-check whether it's a directory
-    elif status == 2:
+    else:
         # It's a file; just return the path to the file
-        return [stat_fn(path, implementation=implementation) if stat else path]
+        return [inode if stat else path]
 
-class Counter:
-    """
-    Class to basically mimic a pointer to an int
-    This is very clumsy in python
-    """
-    def __init__(self):
-        self.i = 0
-    def plus_one(self):
-        self.i += 1
+N_WALK_THREADS = 8
 
 @add_env_kwarg
 def walk(path, stat=False, implementation=None):
     """
     Entry point for walk algorithm.
     Performs a check whether the starting path is a directory,
-    then yields _walk.
-    A counter object is passed to count the number of requests
-    made to the storage element, so that 'accidents' are limited
+    then traverses the tree depth-first, like os.walk.
+    The yielded directories list can be modified in place
+    as in os.walk.
+    The number of requests made to the storage element is counted,
+    so that 'accidents' are limited
+
+    Listings of subdirectories are requested in the background by a pool of
+    N_WALK_THREADS threads, so that SE round trips overlap while the caller
+    processes the current directory. Set N_WALK_THREADS to 1 to walk serially.
+    Prefetched listings count towards MAX_RECURSION_DEPTH from the moment they are
+    requested, so the limit is a hard cap on the number of requests.
     """
-    path = format(path)
     status = is_file_or_dir(path, implementation=implementation)
     if not status == 1:
         raise RuntimeError(
             '{0} is not a directory'
             .format(path)
             )
-    counter = Counter()
-    for i in _walk(path, stat, counter, implementation=implementation):
-        yield i
+    # The pool is only started once there are subdirectories to prefetch
+    pool = None
+    try:
+        # Requests that were consumed, and prefetched requests still waiting on the stack;
+        # together they may never exceed MAX_RECURSION_DEPTH
+        n_requests = 0
+        n_pending = 0
+        # Stack of (path, pending listing or None) to visit; the top is visited next
+        stack = [(path, None)]
+        while stack:
+            path, listing = stack.pop()
+            if listing is None:
+                if n_requests + n_pending >= MAX_RECURSION_DEPTH:
+                    raise RuntimeError(
+                        'walk reached the maximum recursion depth of {0} requests.'
+                        ' If you are very sure that you really need this many requests,'
+                        ' set seutils.MAX_RECURSION_DEPTH to a larger number.'
+                        .format(MAX_RECURSION_DEPTH)
+                        )
+                contents = ls(path, stat=True, assume_isdir=True, implementation=implementation)
+            else:
+                # Already counted against the budget when it was prefetched
+                n_pending -= 1
+                contents = listing.get()
+            n_requests += 1
+            directories = []
+            files = []
+            for c in contents:
+                (directories if c.isdir else files).append(c)
+            files.sort(key=attrgetter('basename'))
+            directories.sort(key=attrgetter('basename'))
+            if stat:
+                yield path, directories, files
+            else:
+                dirnames = [ d.path for d in directories ]
+                yield path, dirnames, [ f.path for f in files ]
+                # Filter directories again based on dirnames, in case the user modified
+                # dirnames after yield
+                dirnames = set(dirnames)
+                directories = [ d for d in directories if d.path in dirnames ]
+            # Prefetch the listings of the subdirectories the user kept, but never more
+            # than the remaining request budget
+            n_prefetch = max(0, MAX_RECURSION_DEPTH - n_requests - n_pending) if N_WALK_THREADS > 1 else 0
+            if n_prefetch and directories and pool is None:
+                from multiprocessing.pool import ThreadPool
+                pool = ThreadPool(N_WALK_THREADS)
+            listings = [
+                pool.apply_async(
+                    ls, (d.path,), dict(stat=True, assume_isdir=True, implementation=implementation)
+                    )
+                for d in directories[:n_prefetch]
+                ]
+            n_pending += len(listings)
+            listings.extend([None] * (len(directories) - len(listings)))
+            # Push in reverse order, so that the first subdirectory is visited next
+            stack.extend(reversed([ (d.path, l) for d, l in zip(directories, listings) ]))
+    finally:
+        if pool is not None:
+            # Drop queued prefetches and wait for the ones in flight, so no requests
+            # are still running once walk is done
+            pool.terminate()
+            pool.join()
 
-def _walk(path, stat, counter, implementation=None):
-    """
-    Recursively calls ls on traversed directories.
-    The yielded directories list can be modified in place
-    as in os.walk.
-    """
-    if counter.i >= MAX_RECURSION_DEPTH:
-        raise RuntimeError(
-            'walk reached the maximum recursion depth of {0} requests.'
-            ' If you are very sure that you really need this many requests,'
-            ' set seutils.MAX_RECURSION_DEPTH to a larger number.'
-            .format(MAX_RECURSION_DEPTH)
-            )
-    contents = ls(path, stat=True, assume_isdir=True, implementation=implementation)
-    counter.plus_one()
-    files = [ c for c in contents if c.isfile ]
-    files.sort(key=lambda f: f.basename)
-    directories = [ c for c in contents if c.isdir ]
-    directories.sort(key=lambda d: d.basename)
-    if stat:
-        yield path, directories, files
-    else:
-        dirnames = [ d.path for d in directories ]
-        yield path, dirnames, [ f.path for f in files ]
-        # Filter directories again based on dirnames, in case the user modified
-        # dirnames after yield
-        directories = [ d for d in directories if d.path in dirnames ]
-    for directory in directories:
-        for i in _walk(directory.path, stat, counter, implementation=implementation):
-            yield i
+# Characters with a special meaning in a regex, other than the wildcard *
+REGEX_SPECIAL_CHARS = frozenset('.^$+?{}[]\\|()')
 
 @add_env_kwarg
 def ls_wildcard(pattern, stat=False, implementation=None):
@@ -663,7 +847,6 @@ def ls_wildcard(pattern, stat=False, implementation=None):
     early.
     Still the number of requests can grow quickly; a limited number of wildcards is advised.
     """
-    pattern = format(pattern)
     if not '*' in pattern:
         return ls(pattern, stat=stat, no_expand_directory=True, implementation=implementation)
     import re
@@ -678,6 +861,16 @@ def ls_wildcard(pattern, stat=False, implementation=None):
         if pattern == '*':
             # Skip the regex matching if set to 'match all'
             return contents
+        if pattern.count('*') == 1 and not any(c in REGEX_SPECIAL_CHARS for c in pattern):
+            # 'a*b' with plain a and b is the regex 'a.*b' under re.match: the basename
+            # starts with a and contains b after that. Plain string methods suffice.
+            prefix, infix = pattern.split('*')
+            n = len(prefix)
+            matches = []
+            for c in contents:
+                basename = osp.basename(c)
+                if basename.startswith(prefix) and infix in basename[n:]: matches.append(c)
+            return matches
         regex = re.compile(pattern.replace('*', '.*'))
         contents = [ c for c in contents if regex.match(osp.basename(c)) ]
         return contents
@@ -688,12 +881,17 @@ def ls_wildcard(pattern, stat=False, implementation=None):
     base = pattern.split('*',1)[0].rsplit('/',1)[0]
     logger.debug('Found base pattern %s from pattern %s', base, pattern)
     matches = []
+    # The regex only depends on the level, so compile it once per level
+    pattern_parts = pattern.split('/')
+    regexes = {}
     for path, directories, files in walk(base, stat=stat, implementation=implementation):
         level = path.count('/')
         logger.debug('Level is %s for path %s', level, path)
-        trimmed_pattern = '/'.join(pattern.split('/')[:level+2]).replace('*', '.*')
-        logger.debug('Comparing directories in %s with pattern %s', path, trimmed_pattern)
-        regex = re.compile(trimmed_pattern)
+        regex = regexes.get(level)
+        if regex is None:
+            trimmed_pattern = '/'.join(pattern_parts[:level+2]).replace('*', '.*')
+            regex = regexes[level] = re.compile(trimmed_pattern)
+        logger.debug('Comparing directories in %s with pattern %s', path, regex.pattern)
         if stat:
             directories[:] = [ d for d in directories if regex.match(d.path) ]
         else:
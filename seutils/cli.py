@@ -126,8 +126,20 @@ def du():
     parser = ParserMultipleRemotePaths()
     parser.add_argument('-s', '--sort', action='store_true', help='Sorts by size instead (default is by name)')
     args = parser.parse_args(expand_wildcards=False)
+    # Paths without wildcards need just a stat each; issue those concurrently
+    plain_paths = [ path for path in args.paths if not '*' in path ]
+    plain_inodes = dict(zip(plain_paths, seutils.stat_many(
+        plain_paths, return_exceptions=True, implementation=args.implementation
+        )))
     for path in args.paths:
-        inodes = seutils.ls_wildcard(path, stat=True, implementation=args.implementation)
+        if path in plain_inodes:
+            inode = plain_inodes[path]
+            # Raise failures only once the output of the preceding paths is printed
+            if isinstance(inode, seutils.NoSuchPath): raise seutils.NoSuchPath(path)
+            if isinstance(inode, Exception): raise inode
+            inodes = [inode]
+        else:
+            inodes = seutils.ls_wildcard(path, stat=True, implementation=args.implementation)
         if args.sort: inodes.sort(key=lambda inode: -inode.size)
         for inode in inodes:
             print('{0:<8} {1}'.format(inode.size_human, inode.path))
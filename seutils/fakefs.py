@@ -8,6 +8,13 @@ import copy
 global_rd = random.Random()
 global_rd.seed(1006)
 
+class FakeInode(seutils.Inode):
+    """
+    Inode that can also hold the (fake) contents of a file
+    """
+    __slots__ = ('_content',)
+
+
 def generate_fake_node(path=None, modtime=None, isdir=None, size=None, parent_dir='/', rd=None, content=None):
     if rd is None: rd = global_rd
     if isdir is None:
@@ -29,7 +36,7 @@ def generate_fake_node(path=None, modtime=None, isdir=None, size=None, parent_di
             )
     if size is None:
         size = rd.randint(100, 1e5) * 10**(int(7*rd.random()))
-    node = seutils.Inode(path, modtime, isdir, size)
+    node = FakeInode(path, modtime, isdir, size)
     if content:
         node._content = content
     return node
@@ -475,7 +482,7 @@ def activate_command_interception(fake_internet=None):
     Fakes the seutils.run_command_rcode_and_output function with the fake interceptors.
     """
     if fake_internet is None: fake_internet = FakeInternet()
-    def fake_run_command_rcode_and_output(cmd, env=None, dry=None):
+    def fake_run_command_rcode_and_output(cmd, env=None, dry=None, **kwargs):
         return fake_internet.intercept(cmd)
     seutils.__backup__run_command_rcode_and_output = seutils.run_command_rcode_and_output
     seutils.run_command_rcode_and_output = fake_run_command_rcode_and_output
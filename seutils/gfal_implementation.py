@@ -1,8 +1,6 @@
 import seutils
-import os.path as osp
 import subprocess
 logger = seutils.logger
-import datetime
 
 
 class GfalImplementation(seutils.Implementation):
@@ -25,17 +23,20 @@ class GfalImplementation(seutils.Implementation):
         modtime = None
         isdir = None
         for line in output:
-            line = line.strip()
-            if len(line) == 0:
-                continue
-            elif line.startswith('Size:'):
-                isdir = ('directory' in line)
-                size = int(line.replace('Size:','').strip().split()[0])
-            elif line.startswith('Modify:'):
-                timestamp = line.replace('Modify:','').strip()
+            key, _, value = line.partition(':')
+            key = key.strip()
+            if key == 'Size':
+                isdir = ('directory' in value)
+                size = int(value.split()[0])
+            elif key == 'Modify':
+                timestamp = value.strip()
                 # Strip off microseconds if they're there
                 if '.' in timestamp: timestamp = timestamp.split('.')[0]
-                modtime = datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+                modtime = seutils.timestamp_to_datetime(timestamp)
+            else:
+                continue
+            # The remaining lines are not needed once all fields are found
+            if not (size is None or modtime is None): break
         if size is None: raise RuntimeError('Could not extract size from stat:\n{0}'.format(output))
         if modtime is None: raise RuntimeError('Could not extract modtime from stat:\n{0}'.format(output))
         if isdir is None: raise RuntimeError('Could not extract isdir from stat:\n{0}'.format(output))
@@ -48,18 +49,15 @@ class GfalImplementation(seutils.Implementation):
     @seutils.listdir_check_isdir
     @seutils.add_env_kwarg
     def listdir(self, directory, stat=False):
-        cmd = [ 'gfal-ls', format(directory) ]
+        cmd = [ 'gfal-ls', directory ]
         if stat: cmd.append('-l')
         output = self.run_command(cmd, path=directory)
-        contents = []
-        for l in output:
-            l = l.strip()
-            if not len(l): continue
-            if stat:
-                contents.append(statline_to_inode(l, directory))
-            else:
-                contents.append(format(osp.join(directory, l)))
-        return contents
+        lines = [ l.strip() for l in output ]
+        if stat:
+            return [ statline_to_inode(l, directory) for l in lines if l ]
+        # SE paths always use '/', so plain concatenation suffices (no osp.join)
+        prefix = directory if directory.endswith('/') else directory + '/'
+        return [ prefix + l for l in lines if l ]
 
     @seutils.rm_safety
     @seutils.add_env_kwarg
@@ -100,8 +98,8 @@ def statline_to_inode(statline, parent_directory):
     `gfal-ls -l` returns only basenames, so the parent_directory from which the
     statline originated is needed as an argument.
     """
-    import datetime
-    components = statline.strip().split()
+    # Split at most 8 times, so that the basename is the last component as a whole
+    components = statline.strip().split(None, 8)
     if not len(components) >= 9:
         raise RuntimeError(
             'Expected at least 9 components for stat line:\n{0}'
@@ -109,13 +107,10 @@ def statline_to_inode(statline, parent_directory):
             )
     try:
         isdir = components[0].startswith('d')
-        timestamp = ' '.join(components[5:8])
-        try:
-            modtime = datetime.datetime.strptime(timestamp, '%b %d %H:%M')
-        except ValueError:
-            modtime = datetime.datetime.strptime(timestamp, '%b %d %Y')
+        modtime = seutils.ls_timestamp_to_datetime(*components[5:8])
         size = int(components[4])
-        path = osp.join(parent_directory, components[8])
+        if not parent_directory.endswith('/'): parent_directory += '/'
+        path = parent_directory + components[8]
         return seutils.Inode(path, modtime, isdir, size)
     except:
         logger.error('Error parsing statline: %s', statline)
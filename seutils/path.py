@@ -93,7 +93,7 @@ def split_mgm(path):
     >>> split_mgm('root://foo.bar.gov//some/path')
     >>> ('root://foo.bar.gov/', '/some/path')
     """
-    assert_valid_path(path)
+    # split_protocol_server_lfn validates the path already
     protocol, server, lfn = split_protocol_server_lfn(path)
     return protocol + '://' + server, lfn
 
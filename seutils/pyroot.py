@@ -25,6 +25,7 @@ def open_root(path, mode='READ'):
     Does nothing if a TDirectory-like object is passed
     '''
     do_open = not(is_tdir(path))
+    tfile = None
     with suppress_root_warnings():
         try:
             if do_open:
@@ -34,7 +35,8 @@ def open_root(path, mode='READ'):
             else:
                 yield path
         finally:
-            if do_open: tfile.Close()
+            # tfile is None (or a null TFile) if opening failed; don't mask that error
+            if tfile: tfile.Close()
 
 @contextmanager
 def suppress_root_warnings():
@@ -47,28 +49,37 @@ def suppress_root_warnings():
         ROOT.gErrorIgnoreLevel = _root_log_level
 
 
+def _iter_keys(node):
+    """
+    Yields the keys of a ROOT TDirectory-like node
+    """
+    listofkeys = node.GetListOfKeys()
+    for i_key in range(listofkeys.GetEntries()):
+        yield listofkeys[i_key]
+
 def _iter_treepaths_recursively_root(node, prefix=''):
     """
     Takes a ROOT TDirectory-like node, and traverses through
     possible sub-TDirectories to yield the names of all TTrees.
     Can take a TFile.
     """
-    listofkeys = node.GetListOfKeys()
-    n_keys = listofkeys.GetEntries()
-    for i_key in range(n_keys):
-        key = listofkeys[i_key]
-        classname = key.GetClassName()
-        # Recurse through TDirectories
-        if classname == 'TDirectoryFile':
-            dirname = key.GetName()
-            lower_node = node.Get(dirname)
-            for tree in _iter_treepaths_recursively_root(lower_node, prefix=prefix+dirname+'/'):
-                yield tree
-        elif not classname == 'TTree':
-            continue
+    # Explicit stack of (node, prefix, remaining keys) instead of recursion,
+    # so deeply nested files cannot hit the recursion limit
+    stack = [(node, prefix, _iter_keys(node))]
+    while stack:
+        node, prefix, keys = stack[-1]
+        for key in keys:
+            classname = key.GetClassName()
+            # Descend into TDirectories; the remaining keys of this node are resumed after
+            if classname == 'TDirectoryFile':
+                dirname = key.GetName()
+                lower_node = node.Get(dirname)
+                stack.append((lower_node, prefix+dirname+'/', _iter_keys(lower_node)))
+                break
+            elif classname == 'TTree':
+                yield prefix + key.GetName()
         else:
-            treename = key.GetName()
-            yield prefix + treename
+            stack.pop()
 
 def trees(rootfile):
     with open_root(rootfile) as tf:
@@ -98,10 +109,21 @@ def iter_branches(node, level=1):
     """
     Yields branches in a ttree recursively
     """
+    # Explicit stack of (level, remaining branches), depth-first like the tree itself
+    stack = [(level, _iter_branches(node))]
+    while stack:
+        level, branches = stack[-1]
+        for branch in branches:
+            yield branch, level
+            stack.append((level+1, _iter_branches(branch)))
+            break
+        else:
+            stack.pop()
+
+def _iter_branches(node):
+    """
+    Yields the direct subbranches of a ttree or branch
+    """
     listofbranches = node.GetListOfBranches()
-    n_branches = listofbranches.GetEntries()
-    for i_branch in range(n_branches):
-        branch = listofbranches[i_branch]
-        yield branch, level
-        for subbranch, sublevel in iter_branches(branch, level=level+1):
-            yield subbranch, sublevel
+    for i_branch in range(listofbranches.GetEntries()):
+        yield listofbranches[i_branch]
@@ -1,6 +1,5 @@
 import seutils
 import os.path as osp, math, sys
-import datetime
 
 class PyxrdImplementation(seutils.Implementation):
 
@@ -127,7 +126,7 @@ def statinfo_to_inode(path, statinfo):
     """
     return seutils.Inode(
         path,
-        datetime.datetime.strptime(statinfo.modtimestr, '%Y-%m-%d %H:%M:%S'),
+        seutils.timestamp_to_datetime(statinfo.modtimestr),
         'IS_DIR' in statinfoflag_to_flags(statinfo.flags),
         statinfo.size
         )
@@ -1,4 +1,4 @@
-import seutils, os
+import seutils, os, datetime
 from seutils import run_command, get_exitcode, Inode, split_mgm
 import os.path as osp
 logger = seutils.logger
@@ -19,21 +19,16 @@ def _split_remote(path):
     return path.split(':', 1)
 
 def _lsstatline_to_inode(l, server, parent_path):
-    import datetime
     components = l.strip().split()
     isdir = components[0].startswith('d')
-    timestamp = ' '.join(components[5:8])
     try:
-        modtime = datetime.datetime.strptime(timestamp, '%b %d %H:%M')
+        modtime = seutils.ls_timestamp_to_datetime(*components[5:8])
     except ValueError:
-        try:
-            modtime = datetime.datetime.strptime(timestamp, '%b %d %Y')
-        except ValueError:
-            logger.error(
-                'Tried multiple patterns but failed to get date from {0}'
-                .format(timestamp)
-                )
-            raise
+        logger.error(
+            'Tried multiple patterns but failed to get date from {0}'
+            .format(' '.join(components[5:8]))
+            )
+        raise
     size = int(components[4])
     path = server + ':' + osp.join(parent_path, ' '.join(components[8:]))
     return Inode(path, modtime, isdir, size)
@@ -60,7 +55,7 @@ def listdir(directory, stat=False):
         if l.startswith('Warning'): continue
         if not len(l): continue
         if stat:
-            if not(l.startswith('d') or l.startswith('-')): continue
+            if not l.startswith(('d', '-')): continue
             contents.append(_lsstatline_to_inode(l, server, path))
         else:
             contents.append(server + ':' + osp.join(path, l))
@@ -86,7 +81,7 @@ def stat(fullpath):
     for l in output:
         l = l.strip()
         if not len(l): continue
-        if not(l.startswith('d') or l.startswith('-')): continue
+        if not l.startswith(('d', '-')): continue
         return _lsstatline_to_inode(l, server, path)
 
 def is_file_or_dir(path):
@@ -122,12 +117,11 @@ def listdir_recursive(path):
     for l in output:
         l = l.strip()
         if not len(l): continue
-        if not(l.startswith('d') or l.startswith('f')): continue
+        if not l.startswith(('d', 'f')): continue
         contents.append(_findline_to_inode(l, server))
     return contents
 
 def _findline_to_inode(line, server):
-    import datetime
     components = line.strip().split()
     path = server + ':' + ' '.join(components[3:])
     isdir = components[0] == 'd'
@@ -24,8 +24,8 @@ def open_uproot(path, mode='READ'):
         if do_open:
             try:
                 yieldable.close()
-            except Exception:
-                pass
+            except Exception as e:
+                seutils.logger.debug('Failed to close %s: %s', path, e)
 
 
 def is_node(f):
@@ -34,7 +34,7 @@ def is_node(f):
     """
     # This is not very robust but the route via isinstance was not working out.
     cls_name = repr(f)
-    return cls_name.startswith('<ROOTDirectory') or cls_name.startswith('<ReadOnlyDirectory')
+    return cls_name.startswith(('<ROOTDirectory', '<ReadOnlyDirectory'))
 
 
 def is_ttree(f):
@@ -57,36 +57,37 @@ def iter_contents(f, prefix='', seen=None, depth=0):
     """
     # Keep a memo of seen memory addresses to avoid double counting
     if seen is None: seen = set()
-    if id(f) in seen: return
-    seen.add(id(f))
+    # Explicit stack of (f, prefix, depth) instead of recursion; the top is visited next
+    stack = [(f, prefix, depth)]
+    while stack:
+        f, prefix, depth = stack.pop()
+        if id(f) in seen: continue
+        seen.add(id(f))
 
-    is_nodelike = is_node(f)
+        is_nodelike = is_node(f)
 
-    # Get a name for this node; Can be either the path (if nodelike) or the treename
-    try:
+        # Get a name for this node; Can be either the path (if nodelike) or the treename
         try:
-            name = (decode(f.path[-1]) if len(f.path) else '') if is_nodelike else decode(f.name)
-        except AttributeError:
-            # uproot3 compatibility
-            name = decode(f.name)
-            name = name.split('.root')[-1]
-    except Exception:
-        # Catch all case if smarter name-giving fails
-        name = repr(f)
-
-    name = os.path.join(prefix, name)
-    if name == '': name = '/'
-
-    # Plug in the tree depth as an attribute
-    f.____depth = depth
-    yield name, f
-
-    # If f is a node-like object, yield also all its children
-    if is_nodelike:
-        for value in f.values():
-            # `yield from` is python 3 only
-            for _ in iter_contents(value, prefix=name, seen=seen, depth=depth+1):
-                yield _
+            try:
+                name = (decode(f.path[-1]) if len(f.path) else '') if is_nodelike else decode(f.name)
+            except AttributeError:
+                # uproot3 compatibility
+                name = decode(f.name)
+                name = name.split('.root')[-1]
+        except Exception:
+            # Catch all case if smarter name-giving fails
+            name = repr(f)
+
+        name = os.path.join(prefix, name)
+        if name == '': name = '/'
+
+        # Plug in the tree depth as an attribute
+        f.____depth = depth
+        yield name, f
+
+        # If f is a node-like object, visit also all its children, in order
+        if is_nodelike:
+            stack.extend(reversed([ (value, name, depth+1) for value in f.values() ]))
 
         
 class UprootImplementation(Implementation):
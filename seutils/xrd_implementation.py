@@ -15,7 +15,6 @@ class XrdImplementation(seutils.Implementation):
 
     @seutils.add_env_kwarg
     def stat(self, path):
-        import datetime
         fullpath = path
         mgm, path = seutils.path.split_mgm(path)
         cmd = [ 'xrdfs', mgm, 'stat', path ]
@@ -25,14 +24,18 @@ class XrdImplementation(seutils.Implementation):
         modtime = None
         isdir = None
         for l in output:
-            l = l.strip()
-            if l.startswith('Size:'):
-                size = int(l.split()[1])
-            elif l.startswith('MTime:'):
-                timestamp = l.replace('MTime:', '').strip()
-                modtime = datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-            elif l.startswith('Flags:'):
-                isdir = 'IsDir' in l
+            key, _, value = l.partition(':')
+            key = key.strip()
+            if key == 'Size':
+                size = int(value.split()[0])
+            elif key == 'MTime':
+                modtime = seutils.timestamp_to_datetime(value.strip())
+            elif key == 'Flags':
+                isdir = 'IsDir' in value
+            else:
+                continue
+            # The remaining lines are not needed once all fields are found
+            if not (size is None or modtime is None or isdir is None): break
         if size is None: raise RuntimeError('Could not extract size from stat:\n{0}'.format(output))
         if modtime is None: raise RuntimeError('Could not extract modtime from stat:\n{0}'.format(output))
         if isdir is None: raise RuntimeError('Could not extract isdir from stat:\n{0}'.format(output))
@@ -68,15 +71,15 @@ class XrdImplementation(seutils.Implementation):
         cmd = [ 'xrdfs', mgm, 'ls', path ]
         if stat: cmd.append('-l')
         output = self.run_command(cmd, path=directory)
-        contents = []
-        for l in output:
-            l = l.strip()
-            if not len(l): continue
-            if stat:
-                contents.append(xrdstatline_to_inode(l, mgm))
-            else:
-                contents.append(seutils.path.format_mgm(mgm, l))
-        return contents
+        # xrdfs outputs absolute lfns, which only need the mgm prepended
+        mgm_prefix = mgm if mgm.endswith('/') else mgm + '/'
+        lines = [ l.strip() for l in output ]
+        if stat:
+            return [ xrdstatline_to_inode(l, mgm_prefix) for l in lines if l ]
+        return [
+            mgm_prefix + l if l.startswith('/') else seutils.path.format_mgm(mgm, l)
+            for l in lines if l
+            ]
 
     @seutils.add_env_kwarg
     def cp(self, src, dst, recursive=False, n_attempts=None, create_parent_directory=True, verbose=True, force=False, parallel=None):
@@ -101,28 +104,31 @@ class XrdImplementation(seutils.Implementation):
             raise e
 
 
+# Positions of isdir, date, time, size and lfn in a `xrdfs ls -l` line, by number of components
+XRDSTATLINE_INDICES = {
+    5 : (0, 1, 2, 3, 4), # xrd 4 standard
+    7 : (0, 4, 5, 3, 6), # xrd 5 standard
+    }
+
 def xrdstatline_to_inode(statline, mgm):
     """
     Converts a plain line as outputted by `xrdfs <mgm> ls -l <path>` into an Inode object
     """
-    import datetime
     components = statline.strip().split()
-    allowed_components = [5,7]
-    if not len(components) in allowed_components:
+    try:
+        i_isdir, i_date, i_time, i_size, i_lfn = XRDSTATLINE_INDICES[len(components)]
+    except KeyError:
         raise RuntimeError(
-            'Expected {} components for stat line:\n{0}'
-            .format(' or '.join(str(c) for c in allowed_components), statline)
+            'Expected {0} components for stat line:\n{1}'
+            .format(' or '.join(str(c) for c in sorted(XRDSTATLINE_INDICES)), statline)
             )
-
-    if len(components)==5:
-        # xrd 4 standard
-        ind = [0,1,2,3,4]
-    elif len(components)==7:
-        # xrd 5 standard
-        ind = [0,4,5,3,6]
-
-    isdir = components[ind[0]].startswith('d')
-    modtime = datetime.datetime.strptime(components[ind[1]] + ' ' + components[ind[2]], '%Y-%m-%d %H:%M:%S')
-    size = int(components[ind[3]])
-    path = seutils.path.format_mgm(mgm, components[ind[4]])
+    isdir = components[i_isdir].startswith('d')
+    modtime = seutils.timestamp_to_datetime(components[i_date] + ' ' + components[i_time])
+    size = int(components[i_size])
+    lfn = components[i_lfn]
+    if lfn.startswith('/') and mgm.endswith('/'):
+        # Common case from listdir: an absolute lfn, no need for format_mgm's checks
+        path = mgm + lfn
+    else:
+        path = seutils.path.format_mgm(mgm, lfn)
     return seutils.Inode(path, modtime, isdir, size)
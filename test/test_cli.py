@@ -87,7 +87,7 @@ def test_ls(fake_internet, implementation):
     assert len(long.split()) == 5 and long.split()[-1] == 'root://foo.bar.gov//foo/bar/test.file'
 
 @pytest.mark.parametrize('implementation', implementations)
-def test_du(fake_internet, implementation):
+def test_du(fake_internet, implementation, monkeypatch):
     fs = fake_internet.fs['root://foo.bar.gov']
     dir1 = fs.stat('root://foo.bar.gov//foo/bar')
     node1 = fs.stat('root://foo.bar.gov//foo/bar/test.file')
@@ -106,6 +106,29 @@ def test_du(fake_internet, implementation):
     assert extract_size_path(capture(
         ['seu-du', 'root://foo.bar.gov//foo/bar/*', '-i', implementation, '-s']
         )) == [(node2.size_human, node2.path), (node1.size_human, node1.path)]
+    assert extract_size_path(capture(
+        ['seu-du', 'root://foo.bar.gov//foo/bar/test.file2', 'root://foo.bar.gov//foo/bar/test.file', '-i', implementation]
+        )) == [(node2.size_human, node2.path), (node1.size_human, node1.path)]
+    # A missing path raises only after the preceding paths are printed
+    with sys_argv(['seu-du', node1.path, 'root://foo.bar.gov//nope', node2.path, '-i', implementation]):
+        with capturing() as output:
+            with pytest.raises(seutils.NoSuchPath):
+                seutils.cli.du()
+    assert extract_size_path(output) == [(node1.size_human, node1.path)]
+    # Failures of plain paths are raised in order too, and are not logged as errors
+    errors = []
+    monkeypatch.setattr(seutils.logger, 'error', lambda *args: errors.append(args))
+    run_command_rcode_and_output_with_retries = seutils.run_command_rcode_and_output_with_retries
+    def fail_nope(cmd, *args, **kwargs):
+        if any('nope' in c for c in cmd): return 3, []
+        return run_command_rcode_and_output_with_retries(cmd, *args, **kwargs)
+    monkeypatch.setattr(seutils, 'run_command_rcode_and_output_with_retries', fail_nope)
+    with sys_argv(['seu-du', node1.path, 'root://foo.bar.gov//nope', node2.path, '-i', implementation]):
+        with capturing() as output:
+            with pytest.raises(seutils.NonZeroExitCode):
+                seutils.cli.du()
+    assert extract_size_path(output) == [(node1.size_human, node1.path)]
+    assert errors == []
 
 
 @pytest.mark.parametrize('implementation', implementations)
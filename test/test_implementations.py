@@ -57,6 +57,34 @@ def test_stat(impl):
     node = impl.stat('root://foo.bar.gov//foo/bar/test.file')
     assert node.path == 'root://foo.bar.gov//foo/bar/test.file'
 
+@pytest.mark.parametrize('impl', implementations, indirect=True)
+def test_stat_many(impl, monkeypatch):
+    paths = ['root://foo.bar.gov//foo/bar/test.file', 'root://foo.bar.gov//foo/bar', 'root://foo.bar.gov//foo']
+    nodes = seutils.stat_many(paths, implementation=impl)
+    assert [ n.path for n in nodes ] == paths
+    assert [ n.isdir for n in nodes ] == [False, True, True]
+    with pytest.raises(seutils.NoSuchPath):
+        seutils.stat_many(paths + ['root://foo.bar.gov//nope'], implementation=impl)
+    errors = []
+    # Only keep run_command's errors; fakefs logs its own for missing paths
+    monkeypatch.setattr(
+        seutils.logger, 'error',
+        lambda msg, *args: errors.append(args) if 'Exit status' in msg else None
+        )
+    nodes = seutils.stat_many(['root://foo.bar.gov//nope'] + paths, not_exist_ok=True, implementation=impl)
+    assert nodes[0] is None
+    assert nodes[1].path == paths[0]
+    # Missing paths are expected with not_exist_ok, and should not be logged as errors
+    assert errors == []
+    with pytest.raises(seutils.NoSuchPath):
+        seutils.stat_many(['root://foo.bar.gov//nope'], implementation=impl)
+    assert len(errors) == 1
+    # Exceptions are expected with return_exceptions, also for unmapped exit codes
+    monkeypatch.setattr(seutils, 'run_command_rcode_and_output_with_retries', lambda *args, **kwargs: (3, []))
+    nodes = seutils.stat_many(paths, return_exceptions=True, implementation=impl)
+    assert all(isinstance(n, seutils.NonZeroExitCode) for n in nodes)
+    assert len(errors) == 1
+
 @pytest.mark.parametrize('impl', implementations, indirect=True)
 def test_isdir(impl):
     assert impl.isdir('root://foo.bar.gov//foo/bar') is True
@@ -182,6 +210,17 @@ def test_put(impl):
 def test_ls(impl):
     seutils.ls('root://foo.bar.gov//foo', implementation=impl) == ['root://foo.bar.gov//foo/bar']
 
+@pytest.mark.parametrize('impl', implementations, indirect=True)
+def test_ls_file(impl):
+    path = 'root://foo.bar.gov//foo/bar/test.file'
+    assert seutils.ls(path, implementation=impl) == [path]
+    inodes = seutils.ls(path, stat=True, implementation=impl)
+    assert len(inodes) == 1
+    assert inodes[0].path == path
+    assert inodes[0].isfile
+    with pytest.raises(seutils.NoSuchPath):
+        seutils.ls('root://foo.bar.gov//foo/nope', implementation=impl)
+
 @pytest.mark.parametrize('impl', implementations, indirect=True)
 def test_walk(impl):
     assert list(seutils.walk('root://foo.bar.gov//foo', implementation=impl)) == [
@@ -189,6 +228,44 @@ def test_walk(impl):
         ('root://foo.bar.gov//foo/bar', [], ['root://foo.bar.gov//foo/bar/test.file']),
         ]
 
+@pytest.mark.parametrize('impl', implementations, indirect=True)
+def test_walk_prune(impl):
+    fs = seutils.active_fake_internet.fs['root://foo.bar.gov']
+    fs.put('root://foo.bar.gov//foo/bla/sub/new.file', isdir=False)
+    fs.put('root://foo.bar.gov//foo/zzz/other.file', isdir=False)
+    visited = []
+    for path, dirnames, files in seutils.walk('root://foo.bar.gov//foo', implementation=impl):
+        visited.append(path)
+        dirnames[:] = [ d for d in dirnames if not d.endswith('/bla') ]
+    assert visited == [
+        'root://foo.bar.gov//foo',
+        'root://foo.bar.gov//foo/bar',
+        'root://foo.bar.gov//foo/zzz',
+        ]
+
+@pytest.mark.parametrize('impl', implementations, indirect=True)
+@pytest.mark.parametrize('n_threads', [1, 4])
+def test_walk_max_requests(impl, n_threads, monkeypatch):
+    fs = seutils.active_fake_internet.fs['root://foo.bar.gov']
+    for i in range(6):
+        for j in range(6):
+            fs.put('root://foo.bar.gov//foo/deep/d{0}/e{1}/test.file'.format(i, j), isdir=False)
+    monkeypatch.setattr(seutils, 'MAX_RECURSION_DEPTH', 5)
+    monkeypatch.setattr(seutils, 'N_WALK_THREADS', n_threads)
+    requested = []
+    ls = seutils.ls
+    def counting_ls(path, *args, **kwargs):
+        requested.append(path)
+        return ls(path, *args, **kwargs)
+    monkeypatch.setattr(seutils, 'ls', counting_ls)
+    with pytest.raises(RuntimeError):
+        for _ in seutils.walk('root://foo.bar.gov//foo/deep', implementation=impl): pass
+    # Prefetches that had not started yet are cancelled when walk raises
+    if n_threads == 1:
+        assert len(requested) == 5
+    else:
+        assert len(requested) <= 5
+
 @pytest.mark.parametrize('impl', implementations, indirect=True)
 def test_ls_wildcard(impl):
     seutils.ls_wildcard('root://foo.bar.gov//foo/*/*', implementation=impl) == ['root://foo.bar.gov//foo/bar/test.file']
@@ -260,3 +337,37 @@ def test_preferred_implementation():
         seutils.PREFERRED_IMPL = None
         seutils.gfal._is_installed = gfal_is_installed
         seutils.xrd._is_installed = xrd_is_installed
+
+
+def test_statline_to_inode():
+    from datetime import datetime
+    from seutils.gfal_implementation import statline_to_inode
+    from seutils.xrd_implementation import xrdstatline_to_inode
+    node = statline_to_inode('-rw-r--r--   1 0     0     1001 Jan 13 10:41 my file.root', 'root://foo.bar.gov//foo')
+    assert node.path == 'root://foo.bar.gov//foo/my file.root'
+    assert node.modtime == datetime(1900, 1, 13, 10, 41)
+    assert node.size == 1001 and node.isfile
+    node = statline_to_inode('drwxr-xr-x   1 0     0     0 Dec  3 2019 bar', 'root://foo.bar.gov//foo/')
+    assert node.path == 'root://foo.bar.gov//foo/bar'
+    assert node.modtime == datetime(2019, 12, 3)
+    assert node.isdir
+    node = xrdstatline_to_inode('-r-- 2019-10-10 10:10:10 1001 /foo/bar/test.file', 'root://foo.bar.gov')
+    assert node.path == 'root://foo.bar.gov//foo/bar/test.file'
+    assert node.modtime == datetime(2019, 10, 10, 10, 10, 10)
+    node = xrdstatline_to_inode('dr-x user group 0 2019-10-10 10:10:10 /foo/bar', 'root://foo.bar.gov')
+    assert node.path == 'root://foo.bar.gov//foo/bar'
+    assert node.isdir
+    with pytest.raises(RuntimeError):
+        xrdstatline_to_inode('dr-x 0 /foo/bar', 'root://foo.bar.gov')
+
+
+@pytest.mark.parametrize('impl', implementations, indirect=True)
+def test_ls_wildcard_last_part(impl):
+    fs = seutils.active_fake_internet.fs['root://foo.bar.gov']
+    for name in ['a_1.root', 'a_2.txt', 'b_1.root']:
+        fs.put('root://foo.bar.gov//foo/bar/' + name, isdir=False)
+    ls = lambda pattern: sorted(osp.basename(p) for p in seutils.ls_wildcard('root://foo.bar.gov//foo/bar/' + pattern, implementation=impl))
+    assert ls('a_*') == ['a_1.root', 'a_2.txt']
+    assert ls('*_1') == ['a_1.root', 'b_1.root']
+    assert ls('a*root') == ['a_1.root']
+    assert ls('*.root') == ['a_1.root', 'b_1.root']
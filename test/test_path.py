@@ -40,6 +40,13 @@ def test_inode_equality():
     right.size = 1002
     assert left != right
 
+def test_bytes_to_human_readable():
+    assert seutils.bytes_to_human_readable(0) == '0.0 b'
+    assert seutils.bytes_to_human_readable(1023) == '1023.0 b'
+    assert seutils.bytes_to_human_readable(1024) == '1.0 kb'
+    assert seutils.bytes_to_human_readable(1536*1024**2) == '1.5 Gb'
+    assert seutils.bytes_to_human_readable(2*1024**9) == '2048.0 Yb'
+
 def test_relpath():
     assert seup.relpath('/foo/bar/bla.txt', '/foo/') == 'bar/bla.txt'
     assert seup.relpath('/foo/bar/bla.txt', '/foo') == 'bar/bla.txt'
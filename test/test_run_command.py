@@ -21,3 +21,12 @@ def test_run_command():
 def test_get_exitcode():
     assert seutils.get_exitcode(['echo']) == 0
     assert seutils.get_exitcode(['ls', 'doesnotexist']) > 0
+
+def test_run_command_rcode_and_output_debug():
+    # Output is streamed in debug mode and read at once otherwise; both should agree
+    cmd = ['printf', 'a\\nb\\n\\nc']
+    with seutils.temp_log_level(seutils.logging.DEBUG):
+        rcode, output_debug = seutils.run_command_rcode_and_output(cmd)
+    with seutils.temp_log_level(seutils.logging.WARNING):
+        rcode, output = seutils.run_command_rcode_and_output(cmd)
+    assert output == output_debug == ['a\n', 'b\n', '\n', 'c']